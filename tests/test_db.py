@@ -0,0 +1,187 @@
+import json
+import sqlite3
+
+import pytest
+
+from app import db, db_pool, db_writer
+
+@pytest.fixture
+def tmp_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "test.db")
+    db.init_db()
+    db_pool.init_pool(db.DB_PATH)
+    yield db
+    db_pool.close_pool()
+    db.close_db()
+
+def _rec(topics, keywords):
+    return {
+        "title": None,
+        "text": "some text",
+        "summary": "some text",
+        "topics": topics,
+        "keywords": keywords,
+        "sentiment": "neutral",
+        "confidence": 0.5,
+    }
+
+def _write(*records):
+    # run the records through the background writer and wait for the flush
+    db_writer.start()
+    try:
+        return [i for i, _ in db_writer.enqueue(list(records))]
+    finally:
+        db_writer.stop()
+
+def test_search_matches_topic_or_keyword(tmp_db):
+    a, b = _write(
+        _rec(["kubernetes", "costs"], ["kubernetes", "costs"]),
+        _rec(["postgres", "pgvector"], ["postgres", "embeddings"]),
+    )
+
+    assert [r["id"] for r in tmp_db.search(topic="Kubernetes")] == [a]
+    assert [r["id"] for r in tmp_db.search(keyword="embeddings")] == [b]
+    assert [r["id"] for r in tmp_db.search(topic="costs", keyword="postgres")] == [b, a]
+    assert tmp_db.search(topic="redis") == []
+    # FTS query syntax in user input is treated as plain text
+    assert [r["id"] for r in tmp_db.search(keyword='"postgres OR')] == []
+
+def test_search_returns_lists_without_source_text(tmp_db):
+    _write(_rec(["rust"], ["rust", "cargo"]))
+    (row,) = tmp_db.search(keyword="rust")
+    assert row["topics"] == ["rust"]
+    assert row["keywords"] == ["rust", "cargo"]
+    assert "text" not in row
+
+def _insert_elsewhere(path) -> int:
+    # a plain AUTOINCREMENT insert from another connection (e.g. another process)
+    conn = sqlite3.connect(path)
+    cur = conn.execute(
+        "INSERT INTO analyses (title, text, summary, topics, keywords, topic_terms, keyword_terms,"
+        " sentiment, confidence, created_at)"
+        " VALUES (NULL, 't', 's', 'java', 'java', 'java', 'java', 'neutral', 0.5, datetime('now'))"
+    )
+    conn.commit()
+    conn.close()
+    return cur.lastrowid
+
+def test_writer_persists_with_reserved_ids(tmp_db):
+    first = _insert_elsewhere(tmp_db.DB_PATH)
+    db_writer.start()
+    try:
+        a = db_writer.enqueue([_rec(["python"], ["python"])])
+        # another writer inserting meanwhile must not take the reserved ids
+        other = _insert_elsewhere(tmp_db.DB_PATH)
+        b = db_writer.enqueue([_rec(["rust"], ["rust"]), _rec(["zig"], ["zig"])])
+    finally:
+        db_writer.stop()  # flushes the queue
+    ids = [i for i, _ in a + b]
+    assert ids == [first + 1, first + 2, first + 3]
+    assert other > first + db_writer.ID_BLOCK
+    rows = {r["id"]: r for r in tmp_db.search()}
+    assert set(rows) == {first, other, *ids}
+    assert rows[first + 2]["topics"] == ["rust"]
+    assert rows[first + 3]["created_at"] == b[1][1]
+
+def test_writer_restart_does_not_skip_ids(tmp_db):
+    (a,) = _write(_rec(["go"], ["go"]))
+    db_writer.start()
+    db_writer.stop()  # nothing enqueued: no block reserved
+    (b,) = _write(_rec(["rust"], ["rust"]))
+    assert b == a + 1
+
+def test_writer_keeps_good_rows_when_one_fails(tmp_db):
+    bad = dict(_rec(["bad"], ["bad"]), confidence="not a number")
+    db_writer.start()
+    try:
+        (good,) = db_writer.enqueue([_rec(["good"], ["good"])])
+        db_writer.enqueue([bad])
+    finally:
+        db_writer.stop()
+    assert [r["id"] for r in tmp_db.search()] == [good[0]]
+
+def test_writer_retries_while_database_is_locked(tmp_db, monkeypatch):
+    real_insert, calls = db.insert_with_ids, []
+
+    def flaky_insert(rows):
+        calls.append(len(rows))
+        if len(calls) < 3:
+            exc = sqlite3.OperationalError("database is locked")
+            exc.sqlite_errorcode = sqlite3.SQLITE_BUSY
+            raise exc
+        real_insert(rows)
+
+    monkeypatch.setattr(db, "insert_with_ids", flaky_insert)
+    monkeypatch.setattr(db_writer, "RETRY_DELAY", 0.001)
+    (new_id,) = _write(_rec(["locked"], ["locked"]))
+    assert len(calls) == 3
+    assert [r["id"] for r in tmp_db.search()] == [new_id]
+
+def test_enqueue_refuses_records_when_writer_died(tmp_db):
+    db_writer.start()
+    try:
+        # end the thread behind the module's back, as a crash would
+        db_writer._QUEUE.put(db_writer._STOP)
+        db_writer._THREAD.join()
+        with pytest.raises(RuntimeError):
+            db_writer.enqueue([_rec(["lost"], ["lost"])])
+    finally:
+        db_writer.stop()
+
+def test_init_db_migrates_baseline_schema(tmp_path, monkeypatch):
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        """
+        CREATE TABLE analyses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, text TEXT NOT NULL,
+            summary TEXT NOT NULL, topics TEXT NOT NULL, keywords TEXT NOT NULL,
+            sentiment TEXT NOT NULL, confidence REAL NOT NULL, created_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "INSERT INTO analyses (title, text, summary, topics, keywords, sentiment, confidence, created_at)"
+        " VALUES (NULL, 't', 's', ?, ?, 'neutral', 0.5, datetime('now'))",
+        (json.dumps(["rust", "go"]), json.dumps(["rust", "cargo"])),
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(db, "DB_PATH", path)
+    db.init_db()
+    db_pool.init_pool(path)
+    try:
+        (row,) = db.search(topic="rust")
+        assert row["topics"] == ["rust", "go"]
+        assert row["keywords"] == ["rust", "cargo"]
+        assert [r["id"] for r in db.search(keyword="cargo")] == [1]
+        (new_id,) = _write(_rec(["zig"], ["zig"]))
+        assert [r["id"] for r in db.search(topic="zig")] == [new_id]
+    finally:
+        db_pool.close_pool()
+        db.close_db()
+
+def test_init_db_converts_json_lists(tmp_db):
+    # rows written while the FTS columns existed but lists were still JSON
+    conn = sqlite3.connect(tmp_db.DB_PATH)
+    conn.execute(
+        "INSERT INTO analyses (title, text, summary, topics, keywords, topic_terms, keyword_terms,"
+        " sentiment, confidence, created_at)"
+        " VALUES (NULL, 't', 's', ?, ?, 'go', 'go python', 'neutral', 0.5, datetime('now'))",
+        (json.dumps(["go"]), json.dumps(["go", "python"])),
+    )
+    conn.execute("PRAGMA user_version = 0")  # as if written before the migration existed
+    conn.commit()
+    conn.close()
+
+    tmp_db.init_db()
+    (row,) = tmp_db.search(keyword="python")
+    assert row["topics"] == ["go"]
+    assert row["keywords"] == ["go", "python"]
+
+def test_init_db_skips_migration_once_current(tmp_db, monkeypatch):
+    def fail(conn):
+        raise AssertionError("migration ran on an up-to-date database")
+    monkeypatch.setattr(tmp_db, "_migrate", fail)
+    tmp_db.init_db()
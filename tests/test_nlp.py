@@ -11,3 +11,19 @@ def test_analyze_text():
     assert out["sentiment"] in {"positive", "neutral", "negative"}
     assert len(out["keywords"]) <= 3
     assert len(out["topics"]) <= 3
+
+def test_analyze_text_cache_returns_fresh_lists():
+    text = "Rust makes systems programming safer. Rust programs are fast."
+    first = analyze_text(text, title="Rust")
+    first["keywords"].append("mutated")
+    second = analyze_text(text, title="Rust")
+    assert "mutated" not in second["keywords"]
+    assert second["keywords"][0] == "rust"
+
+def test_analyze_cache_is_bounded(monkeypatch):
+    from app import nlp
+    monkeypatch.setattr(nlp, "_CACHE_SIZE", 2)
+    monkeypatch.setattr(nlp, "_cache", type(nlp._cache)())
+    for i in range(5):
+        analyze_text(f"Document number {i} talks about caching.")
+    assert len(nlp._cache) == 2